@@ -0,0 +1,303 @@
+"""Seed a local database and load-test the storefront flows.
+
+    python benchmark.py --games 5000 --users 200 --workers 8 --output results.json
+    python benchmark.py --compare results.json
+
+The database defaults to a throwaway SQLite file; pass --database to point at
+a local Postgres instead (it is only wiped when --reset is given).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from queue import Queue
+
+FLOWS = ['browse', 'product_detail', 'add_to_cart', 'cart', 'checkout', 'purchase_history']
+PASSWORD = 'benchmark'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='SQLAlchemy URL (default: a temporary SQLite file).')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate tables on a non-SQLite database.')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--hardware', type=int, default=200)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--cart-items', type=int, default=5, help='Items in each seeded cart.')
+    parser.add_argument('--purchases', type=int, default=20, help='Purchase history rows per user.')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per flow.')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent clients.')
+    parser.add_argument('--flows', default=','.join(FLOWS), help='Comma-separated subset of flows to run.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON to this path.')
+    parser.add_argument('--compare', help='Previous results JSON to check for regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative p95 slowdown before a flow counts as regressed.')
+    return parser.parse_args()
+
+
+def seed(app, db, insert, models, args, rng):
+    Genre, Publisher, ESRBRating, NumberOfPlayers, Game, Hardware, User, Cart, PurchaseHistory = models
+    now = datetime.now()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(Genre), [{'genre_id': i, 'genre_name': f'Genre {i}'} for i in range(1, 21)])
+        db.session.execute(insert(Publisher), [{'publisher_id': i, 'publisher_name': f'Publisher {i}'}
+                                                  for i in range(1, 51)])
+        db.session.execute(insert(ESRBRating), [{'esrb_id': i, 'rating_name': name}
+                                                   for i, name in enumerate(['E', 'E10+', 'T', 'M'], start=1)])
+        db.session.execute(insert(NumberOfPlayers), [{'players_id': i, 'players_count': str(i)}
+                                                        for i in range(1, 5)])
+        db.session.execute(insert(Game), [{
+            'game_id': i,
+            'game_name': f'Game {i}',
+            'description': f'Synthetic game number {i}',
+            'price': Decimal(rng.randint(999, 6999)) / 100,
+            'release_date': date(2017, 3, 3) + timedelta(days=i % 2500),
+            'genre_id': rng.randint(1, 20),
+            'publisher_id': rng.randint(1, 50),
+            'esrb_id': rng.randint(1, 4),
+            'players_id': rng.randint(1, 4),
+            'stock_quantity': 1000000,
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now - timedelta(minutes=i),
+        } for i in range(1, args.games + 1)])
+        db.session.execute(insert(Hardware), [{
+            'hardware_id': i,
+            'hardware_name': f'Hardware {i}',
+            'description': f'Synthetic accessory number {i}',
+            'price': Decimal(rng.randint(1999, 39999)) / 100,
+            'manufacturer': rng.choice(['Nintendo', 'Hori', 'PowerA', '8BitDo']),
+            'sku': f'BENCH-{i}',
+            'stock_quantity': 1000000,
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now - timedelta(minutes=i),
+        } for i in range(1, args.hardware + 1)])
+
+        # One cheap hash shared by every seeded account keeps login fast.
+        password_hash = app.extensions['benchmark_hash']
+        db.session.execute(insert(User), [{
+            'user_id': i, 'username': f'bench{i}', 'email': f'bench{i}@example.com',
+            'password_hash': password_hash, 'full_name': f'Bench User {i}', 'is_admin': False,
+        } for i in range(1, args.users + 1)])
+
+        def random_product():
+            if args.hardware and rng.random() < 0.2:
+                return {'game_id': None, 'hardware_id': rng.randint(1, args.hardware)}
+            return {'game_id': rng.randint(1, args.games), 'hardware_id': None}
+
+        carts, purchases = [], []
+        for user_id in range(1, args.users + 1):
+            for _ in range(args.cart_items):
+                carts.append(dict(random_product(), user_id=user_id, quantity=1))
+            for _ in range(args.purchases):
+                purchases.append(dict(random_product(), user_id=user_id, quantity=1, total_price=Decimal('19.99'),
+                                      purchase_date=now - timedelta(hours=rng.randint(1, 24 * 365))))
+        if carts:
+            db.session.execute(insert(Cart).execution_options(render_nulls=True), carts)
+        if purchases:
+            db.session.execute(insert(PurchaseHistory).execution_options(render_nulls=True), purchases)
+        db.session.commit()
+
+
+class Runner:
+    def __init__(self, app, args, rng):
+        self.app = app
+        self.args = args
+        self.rng = rng
+        self.rng_lock = threading.Lock()
+        self.clients = Queue()
+        for user_id in range(1, min(args.workers, args.users) + 1):
+            client = app.test_client()
+            response = client.post('/login', data={'email': f'bench{user_id}@example.com', 'password': PASSWORD})
+            if response.status_code != 302:
+                raise SystemExit(f'could not log in benchmark user {user_id}')
+            self.clients.put(client)
+
+    def random(self, method, *args):
+        with self.rng_lock:
+            return getattr(self.rng, method)(*args)
+
+    def random_product(self):
+        if self.args.hardware and self.random('random') < 0.2:
+            return 'hardware', self.random('randint', 1, self.args.hardware)
+        return 'game', self.random('randint', 1, self.args.games)
+
+    def request(self, flow, client):
+        if flow == 'browse':
+            params = {'type': self.random('choice', ['game', 'hardware']),
+                      'sort': self.random('choice', ['id', 'price', 'created_at'])}
+            if params['type'] == 'game' and self.random('random') < 0.5:
+                params['genre_id'] = self.random('randint', 1, 20)
+            return client.get('/products', query_string=params)
+        if flow == 'product_detail':
+            product_type, product_id = self.random_product()
+            return client.get(f'/product/{product_type}/{product_id}')
+        if flow == 'add_to_cart':
+            product_type, product_id = self.random_product()
+            return client.post('/add_to_cart', data={'product_id': product_id, 'product_type': product_type,
+                                                     'quantity': 1})
+        if flow == 'cart':
+            return client.get('/cart')
+        if flow == 'checkout':
+            product_type, product_id = self.random_product()
+            client.post('/add_to_cart', data={'product_id': product_id, 'product_type': product_type,
+                                              'quantity': 1})
+            return client.post('/checkout')
+        if flow == 'purchase_history':
+            return client.get('/purchase_history')
+        raise ValueError(flow)
+
+    def run_flow(self, flow):
+        def one(_):
+            client = self.clients.get()
+            try:
+                # Only the last request of a flow is timed, so the item the
+                # checkout flow adds to the cart is not part of its latency.
+                response = self.request(flow, client)
+                return response.request_elapsed, response.status_code, int(response.headers.get('X-Query-Count', 0))
+            except Exception as e:  # a failing route is a result, not a crash
+                print(f'{flow}: {e!r}', file=sys.stderr)
+                return None, 500, 0
+            finally:
+                self.clients.put(client)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.workers) as pool:
+            samples = list(pool.map(one, range(self.args.requests)))
+        wall = time.perf_counter() - started
+        return summarize(samples, wall)
+
+
+def summarize(samples, wall):
+    from app import percentile
+    timings = [elapsed * 1000 for elapsed, status, _ in samples if elapsed is not None and status < 500]
+    queries = [count for _, status, count in samples if status < 500]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for elapsed, status, _ in samples if elapsed is None or status >= 500),
+        'throughput_rps': round(len(samples) / wall, 1) if wall else None,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'mean_queries': round(sum(queries) / len(queries), 2) if queries else None,
+        'max_queries': max(queries) if queries else None,
+    }
+
+
+def timed_client(app):
+    from flask.testing import FlaskClient
+
+    class TimedClient(FlaskClient):
+        def open(self, *args, **kwargs):
+            started = time.perf_counter()
+            response = super().open(*args, **kwargs)
+            response.request_elapsed = time.perf_counter() - started
+            return response
+
+    app.test_client_class = TimedClient
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for flow, current in results['flows'].items():
+        previous = baseline.get('flows', {}).get(flow)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{flow}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous['max_queries'] is not None and (current['max_queries'] or 0) > previous['max_queries']:
+            regressions.append(f"{flow}: max queries {previous['max_queries']} -> {current['max_queries']}")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{flow}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    flows = [flow for flow in args.flows.split(',') if flow]
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        raise SystemExit(f'unknown flows: {", ".join(sorted(unknown))}')
+
+    database = args.database or 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='nintendo-bench-'), 'bench.db')
+    if not database.startswith('sqlite') and not args.reset:
+        raise SystemExit('refusing to wipe a non-SQLite database without --reset')
+    os.environ['DATABASE_URL'] = database
+    os.environ.setdefault('CACHE_BACKEND', 'memory')
+    # Seeded users share one cheap hash; keep it current so logins are not
+    # upgraded to the production hash method mid-run.
+    os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from app import (app, db, Genre, Publisher, ESRBRating, NumberOfPlayers, Game, Hardware, User, Cart,
+                     PurchaseHistory, rebuild_catalog_items)
+
+    # X-Query-Count is only emitted in testing mode; record counts instead of
+    # failing requests on the per-route budgets.
+    app.testing = True
+    app.config['QUERY_BUDGETS'] = {}
+    # Every simulated shopper logs in from the same address.
+    app.config['RATE_LIMITS'] = {}
+    app.extensions['benchmark_hash'] = generate_password_hash(PASSWORD, method=app.config['PASSWORD_HASH_METHOD'])
+    timed_client(app)
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    seed(app, db, insert, (Genre, Publisher, ESRBRating, NumberOfPlayers, Game, Hardware, User, Cart, PurchaseHistory),
+         args, rng)
+    with app.app_context():
+        rebuild_catalog_items()
+    print(f'seeded {database} in {time.perf_counter() - started:.1f}s')
+
+    runner = Runner(app, args, rng)
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'database': database.split(':', 1)[0],
+        'config': {name: getattr(args, name) for name in
+                   ('games', 'hardware', 'users', 'cart_items', 'purchases', 'requests', 'workers', 'seed')},
+        'flows': {},
+    }
+    print(f"{'flow':<18}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+    for flow in flows:
+        summary = runner.run_flow(flow)
+        results['flows'][flow] = summary
+        print(f"{flow:<18}{summary['throughput_rps']:>9}{summary['p50_ms']:>9}{summary['p95_ms']:>9}"
+              f"{summary['p99_ms']:>9}{summary['mean_queries']!s:>9}{summary['errors']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'wrote {args.output}')
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
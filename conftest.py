@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Tests run against a scratch SQLite database, never the configured one, so
+# point the app at it before anything imports app.py.
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='nintendo-test-'), 'test.db')
+os.environ['DATABASE_REPLICA_URLS'] = ''
+os.environ['CACHE_BACKEND'] = 'memory'
+os.environ['CART_BACKEND'] = 'database'
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
@@ -0,0 +1,71 @@
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.security import generate_password_hash
+
+from app import (app, db, cache, Genre, Publisher, ESRBRating, NumberOfPlayers, Game, Hardware, User, Address,
+                 rebuild_catalog_items)
+
+PASSWORD = 'test-password'
+SHOPPERS = 4
+
+
+@event.listens_for(Engine, 'connect')
+def enable_foreign_keys(dbapi_connection, connection_record):
+    # PostgreSQL always enforces them; SQLite only when asked.
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.execute('PRAGMA foreign_keys = ON')
+
+
+@pytest.fixture
+def database():
+    """Three games and two consoles, ten of each in stock, and SHOPPERS
+    users (shopper1@example.com, ...) with an address each."""
+    app.testing = True
+    cache.clear()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([Genre(genre_id=1, genre_name='Adventure'), Publisher(publisher_id=1, publisher_name='Nintendo'),
+                            ESRBRating(esrb_id=1, rating_name='E'), NumberOfPlayers(players_id=1, players_count='1-4')])
+        db.session.add_all([Game(game_id=i, game_name=f'Game {i}', description='A game', price=Decimal('59.99'),
+                                 release_date=date(2023, 1, 1), genre_id=1, publisher_id=1, esrb_id=1, players_id=1,
+                                 stock_quantity=10)
+                            for i in range(1, 4)])
+        db.session.add_all([Hardware(hardware_id=i, hardware_name=f'Console {i}', price=Decimal('299.99'),
+                                     manufacturer='Nintendo', sku=f'SKU-{i}', stock_quantity=10)
+                            for i in range(1, 3)])
+        password_hash = generate_password_hash(PASSWORD, method=app.config['PASSWORD_HASH_METHOD'])
+        users = [User(username=f'shopper{i}', email=f'shopper{i}@example.com', full_name=f'Shopper {i}',
+                      password_hash=password_hash)
+                 for i in range(1, SHOPPERS + 1)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all([Address(user_id=user.user_id, address_line1='1 Main St', city='Kyoto', state='Kyoto',
+                                    postal_code='600-0000', country='Japan')
+                            for user in users])
+        db.session.commit()
+        rebuild_catalog_items()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def login(database):
+    def login(user_id=1):
+        client = app.test_client()
+        response = client.post('/login', data={'email': f'shopper{user_id}@example.com', 'password': PASSWORD})
+        assert response.status_code == 302
+        return client
+    return login
+
+
+@pytest.fixture
+def client(login):
+    return login()
@@ -0,0 +1,64 @@
+import pytest
+
+from app import app, db, Game, Hardware, InventoryEntry, User
+
+
+@pytest.fixture
+def admin(login):
+    with app.app_context():
+        db.session.get(User, 1).is_admin = True
+        db.session.commit()
+    return login()
+
+
+def game_form(**changes):
+    form = {'game_name': 'Game 1', 'description': 'A game', 'price': '49.99', 'stock_quantity': '7',
+            'release_date': '2023-01-01', 'genre_id': '1', 'publisher_id': '1', 'esrb_id': '1', 'players_id': '1',
+            'game_file_size': '', 'country_of_origin': '', 'play_modes': '', 'image_url': ''}
+    form.update(changes)
+    return form
+
+
+def test_edit_product_form_renders(admin):
+    response = admin.get('/admin/product/edit/game/1')
+    assert response.status_code == 200
+    assert b'value="Game 1"' in response.data
+    response = admin.get('/admin/product/edit/hardware/1')
+    assert response.status_code == 200
+    assert b'value="SKU-1"' in response.data
+
+
+def test_edit_product_saves_and_records_stock(admin):
+    response = admin.post('/admin/product/edit/game/1', data=game_form())
+    assert response.status_code == 302
+    with app.app_context():
+        game = db.session.get(Game, 1)
+        assert (str(game.price), game.stock_quantity) == ('49.99', 7)
+        entry = InventoryEntry.query.filter_by(kind='adjustment').one()
+        assert (entry.quantity, entry.balance) == (-3, 7)
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'stock_quantity': 'ten'}, b'invalid stock_quantity'),
+    ({'stock_quantity': '-1'}, b'invalid stock_quantity'),
+    ({'price': 'free'}, b'invalid price'),
+    ({'release_date': 'soon'}, b'invalid release_date'),
+    ({'genre_id': '99'}, b'unknown genre_id'),
+    ({'game_name': 'Game 2'}, b'Another product already uses that name or SKU.'),
+])
+def test_edit_product_rejects_bad_input(admin, changes, message):
+    response = admin.post('/admin/product/edit/game/1', data=game_form(**changes))
+    assert response.status_code == 400
+    assert message in response.data
+    with app.app_context():
+        game = db.session.get(Game, 1)
+        assert (game.game_name, game.stock_quantity) == ('Game 1', 10)
+
+
+def test_edit_hardware_rejects_a_duplicate_sku(admin):
+    response = admin.post('/admin/product/edit/hardware/1', data={'hardware_name': 'Console 1', 'price': '299.99',
+                                                                   'stock_quantity': '10', 'sku': 'SKU-2'})
+    assert response.status_code == 400
+    assert b'value="SKU-2"' in response.data
+    with app.app_context():
+        assert db.session.get(Hardware, 1).sku == 'SKU-1'
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from app import app, db, Cart, Game, Hardware, PurchaseHistory, MemoryCartStore, perform_checkout
+
+
+@pytest.fixture
+def store(database, monkeypatch):
+    # A long interval keeps the background flusher out of the way; the tests
+    # flush by hand.
+    store = MemoryCartStore(3600)
+    monkeypatch.setattr('app.cart_store', store)
+    return store
+
+
+def cart_rows(user_id):
+    return sorted(((row.game_id, row.hardware_id, row.quantity) for row in Cart.query.filter_by(user_id=user_id)),
+                  key=lambda row: (row[0] or 0, row[1] or 0))
+
+
+def test_add_to_cart_rejects_unknown_products(client, store):
+    response = client.post('/add_to_cart', data={'product_type': 'game', 'product_id': 999, 'quantity': 1})
+    assert response.status_code == 404
+    response = client.post('/add_to_cart', data={'product_type': 'game', 'product_id': 'x', 'quantity': 1})
+    assert response.status_code == 404
+    response = client.post('/add_to_cart', data={'product_type': 'game', 'product_id': 1, 'quantity': 0})
+    assert response.status_code == 400
+    with app.app_context():
+        assert store.items(1) == []
+
+
+def test_flush_writes_back_pending_carts(client, store):
+    client.post('/add_to_cart', data={'product_type': 'game', 'product_id': 1, 'quantity': 2})
+    client.post('/add_to_cart', data={'product_type': 'hardware', 'product_id': 1, 'quantity': 1})
+    with app.app_context():
+        assert cart_rows(1) == []
+        assert store.flush() == 1
+        assert cart_rows(1) == [(None, 1, 1), (1, None, 2)]
+        assert store.flush() == 0
+
+
+def test_flush_drops_lines_for_deleted_products(database, store):
+    with app.app_context():
+        store.add(1, 'game', 1, 1)
+        store.add(2, 'game', 999, 1)
+        store.add(2, 'game', 2, 1)
+        assert store.flush() == 2
+        assert cart_rows(1) == [(1, None, 1)]
+        assert cart_rows(2) == [(2, None, 1)]
+        assert store.items(2) == [(('game', 2), 1)]
+
+
+def test_failed_cart_stays_dirty_without_blocking_the_batch(database, store, monkeypatch):
+    with app.app_context():
+        store.add(1, 'game', 1, 1)
+        store.add(2, 'game', 999, 1)
+        # A cart that still fails after pruning is kept for a later flush.
+        monkeypatch.setattr(store, '_prune', lambda user_id, items: items)
+        assert store.flush() == 1
+        assert cart_rows(1) == [(1, None, 1)]
+        assert cart_rows(2) == []
+        with pytest.raises(Exception):
+            store.flush(2)
+
+        monkeypatch.undo()
+        assert store.flush() == 1
+        assert cart_rows(2) == []
+        assert store.flush() == 0
+
+
+def test_checkout_includes_a_cart_claimed_by_the_flusher(client, store):
+    client.post('/add_to_cart', data={'product_type': 'game', 'product_id': 1, 'quantity': 1})
+    client.post('/add_to_cart', data={'product_type': 'hardware', 'product_id': 2, 'quantity': 1})
+    with app.app_context():
+        # The background flusher has taken the user off the dirty set but not
+        # written the cart yet.
+        claimed = store._pop_dirty(10)
+        assert claimed == [1]
+
+    assert client.post('/checkout').status_code == 302
+
+    with app.app_context():
+        assert {(p.game_id, p.hardware_id) for p in PurchaseHistory.query} == {(1, None), (None, 2)}
+        for user_id in claimed:
+            store._mark_dirty(user_id)
+        store.flush()
+        assert cart_rows(1) == []
+        assert store.items(1) == []
+
+
+def test_concurrent_checkouts_lock_products_in_one_order(database):
+    orders = [[('game', 1), ('game', 2), ('hardware', 1)], [('hardware', 1), ('game', 2), ('game', 1)],
+              [('game', 2), ('hardware', 1), ('game', 1)], [('hardware', 1), ('game', 1), ('game', 2)]]
+    with app.app_context():
+        for user_id, lines in enumerate(orders, 1):
+            for product_type, product_id in lines:
+                db.session.add(Cart(user_id=user_id, quantity=1, **{f'{product_type}_id': product_id}))
+        db.session.commit()
+
+    results = {}
+
+    def shop(user_id):
+        with app.app_context():
+            results[user_id] = len(perform_checkout(user_id))
+
+    threads = [threading.Thread(target=shop, args=(user_id,)) for user_id in range(1, len(orders) + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {user_id: 3 for user_id in range(1, len(orders) + 1)}
+    with app.app_context():
+        assert db.session.get(Game, 1).stock_quantity == 10 - len(orders)
+        assert db.session.get(Game, 2).stock_quantity == 10 - len(orders)
+        assert db.session.get(Hardware, 1).stock_quantity == 10 - len(orders)
+        assert Cart.query.count() == 0
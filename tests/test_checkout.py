@@ -0,0 +1,38 @@
+import threading
+
+from app import app, db, Cart, Game, InventoryEntry, PurchaseHistory, User, OutOfStockError, perform_checkout
+
+
+def test_concurrent_checkouts_sell_the_last_unit_once(database):
+    with app.app_context():
+        shoppers = [user_id for user_id, in db.session.query(User.user_id)]
+        db.session.get(Game, 1).stock_quantity = 1
+        db.session.add_all([Cart(user_id=user_id, game_id=1, quantity=1) for user_id in shoppers])
+        db.session.commit()
+
+    start = threading.Barrier(len(shoppers))
+    results = {}
+
+    def shop(user_id):
+        with app.app_context():
+            start.wait()
+            try:
+                results[user_id] = len(perform_checkout(user_id))
+            except OutOfStockError as e:
+                results[user_id] = e
+
+    threads = [threading.Thread(target=shop, args=(user_id,)) for user_id in shoppers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == len(shoppers)
+    winners = [user_id for user_id, result in results.items() if result == 1]
+    assert len(winners) == 1
+    assert all(isinstance(result, OutOfStockError) for user_id, result in results.items() if user_id not in winners)
+    with app.app_context():
+        assert db.session.get(Game, 1).stock_quantity == 0
+        assert [purchase.user_id for purchase in PurchaseHistory.query] == winners
+        assert InventoryEntry.query.filter_by(kind='sale').count() == 1
+        assert Cart.query.count() == len(shoppers) - 1
@@ -0,0 +1,60 @@
+import io
+import json
+
+from sqlalchemy.exc import IntegrityError
+
+import app as shop
+from app import app, Hardware, import_products
+
+
+def hardware(name, sku, **fields):
+    return dict({'product_type': 'hardware', 'hardware_name': name, 'sku': sku, 'price': '99.00',
+                 'stock_quantity': 3}, **fields)
+
+
+def run_import(lines, batch_size=None):
+    stream = io.StringIO(''.join(line if isinstance(line, str) else json.dumps(line) + '\n' for line in lines))
+    with app.app_context():
+        return import_products(stream, 'jsonl', batch_size)
+
+
+def imported_skus():
+    with app.app_context():
+        return {item.sku for item in Hardware.query.filter(Hardware.sku.like('IMP-%'))}
+
+
+def test_json_values_that_are_not_objects_are_line_errors(database):
+    report = run_import(['[1]\n', '"x"\n', '3\n', hardware('Dock', 'IMP-1')])
+    assert [error['line'] for error in report['errors']] == [1, 2, 3]
+    assert all(error['error'] == 'expected a JSON object' for error in report['errors'])
+    assert report['upserted'] == 1
+    assert imported_skus() == {'IMP-1'}
+
+
+def test_negative_stock_is_rejected(database):
+    report = run_import([hardware('Dock', 'IMP-1', stock_quantity=-4), hardware('Stand', 'IMP-2')])
+    assert report['errors'] == [{'line': 1, 'error': "invalid stock_quantity -4"}]
+    assert imported_skus() == {'IMP-2'}
+
+
+def test_over_long_values_are_line_errors(database):
+    report = run_import([hardware('D' * 101, 'IMP-1'), hardware('Stand', 'IMP-2')])
+    assert report['errors'] == [{'line': 1, 'error': 'hardware_name is longer than 100 characters'}]
+    assert imported_skus() == {'IMP-2'}
+
+
+def test_a_batch_the_database_rejects_is_reported_and_skipped(database, monkeypatch):
+    upsert_products = shop.upsert_products
+
+    def failing_upsert(product_type, rows):
+        if any(row['sku'] == 'IMP-3' for row in rows):
+            raise IntegrityError('INSERT INTO hardware', {}, Exception('UNIQUE constraint failed: hardware.upc'))
+        return upsert_products(product_type, rows)
+
+    monkeypatch.setattr(shop, 'upsert_products', failing_upsert)
+    report = run_import([hardware(f'Console {i}', f'IMP-{i}') for i in range(1, 6)], batch_size=2)
+    assert report['errors'] == [{'line': 3, 'last_line': 4,
+                                 'error': 'batch rejected: UNIQUE constraint failed: hardware.upc'}]
+    assert report['error_count'] == 2
+    assert report['upserted'] == 3
+    assert imported_skus() == {'IMP-1', 'IMP-2', 'IMP-5'}
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from app import app, db, CatalogItem, Hardware, catalog_page, keyset_page
+
+
+def walk(page):
+    """Follow next_cursor to the end, failing instead of looping forever."""
+    seen, cursor = [], None
+    for _ in range(10):
+        rows, cursor = page(cursor)
+        seen.extend(rows)
+        if cursor is None:
+            return seen
+    pytest.fail(f'still paging after {seen}')
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_catalog_pages_past_null_sort_values(database, order):
+    with app.app_context():
+        CatalogItem.query.filter_by(product_type='game', product_id=1).update({'created_at': datetime(2024, 1, 1)})
+        CatalogItem.query.filter_by(product_type='game').filter(CatalogItem.product_id > 1).update({'created_at': None})
+        db.session.commit()
+        rows = walk(lambda cursor: catalog_page('game', {}, 'created_at', order, cursor, limit=1))
+        ids = [row.product_id for row in rows]
+    assert ids == ([1, 2, 3] if order == 'asc' else [3, 2, 1])
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_admin_pages_past_null_stock(database, order):
+    with app.app_context():
+        Hardware.query.filter_by(hardware_id=1).update({'stock_quantity': None})
+        db.session.commit()
+        rows = walk(lambda cursor: keyset_page(Hardware.query, Hardware.hardware_id, Hardware.stock_quantity, 'stock',
+                                               order, cursor, 1))
+        ids = [row.hardware_id for row in rows]
+    assert ids == ([2, 1] if order == 'asc' else [1, 2])
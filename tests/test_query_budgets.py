@@ -0,0 +1,52 @@
+import pytest
+
+from app import app, PurchaseHistory
+
+
+def query_count(response):
+    # check_query_budget raises when a budget is exceeded; the header shows
+    # the budgeted endpoints were actually measured.
+    return int(response.headers['X-Query-Count'])
+
+
+def test_cart_endpoints_stay_within_budget(client):
+    budgets = app.config['QUERY_BUDGETS']
+    for product_type, product_id in (('game', 1), ('game', 2), ('hardware', 1)):
+        response = client.post('/add_to_cart', data={'product_type': product_type, 'product_id': product_id,
+                                                      'quantity': 1})
+        assert response.status_code == 200
+        assert query_count(response) <= budgets['add_to_cart']
+
+    response = client.get('/cart')
+    assert response.status_code == 200
+    assert query_count(response) <= budgets['cart']
+
+    response = client.post('/update_cart_item', data={'product_type': 'game', 'product_id': 1, 'quantity': 3})
+    assert response.status_code == 302
+    assert query_count(response) <= budgets['update_cart_item']
+
+    response = client.post('/remove_from_cart', data={'product_type': 'game', 'product_id': 2})
+    assert response.status_code == 302
+    assert query_count(response) <= budgets['remove_from_cart']
+
+
+def test_checkout_and_history_stay_within_budget(client):
+    budgets = app.config['QUERY_BUDGETS']
+    for product_type, product_id in (('game', 1), ('game', 3), ('hardware', 2)):
+        client.post('/add_to_cart', data={'product_type': product_type, 'product_id': product_id, 'quantity': 2})
+
+    response = client.post('/checkout')
+    assert response.status_code == 302
+    assert query_count(response) <= budgets['checkout']
+    with app.app_context():
+        assert PurchaseHistory.query.count() == 3
+
+    response = client.get('/purchase_history')
+    assert response.status_code == 200
+    assert query_count(response) <= budgets['purchase_history']
+
+
+def test_exceeding_a_budget_fails_the_request(client, monkeypatch):
+    monkeypatch.setitem(app.config['QUERY_BUDGETS'], 'cart', 0)
+    with pytest.raises(AssertionError, match='cart issued'):
+        client.get('/cart')